@@ -31,6 +31,7 @@
 #include <iostream>
 #include <sstream>
 #include <string>
+#include <vector>
 
 using namespace std;
 
@@ -190,13 +191,19 @@ void PrintHelp(char** argv)
     printf("                          example to run. The default is \"xytheta\".\n");
     printf("<env_t>                   One of 2d, xytheta, xythetamlev, robarm.\n");
     printf("[--planner=<planner_t>]   (optional) Select a planner to use for the example.\n");
-    printf("                          The default is \"arastar\".\n");
+    printf("                          The default is \"arastar\". A comma-separated list\n");
+    printf("                          (e.g. \"arastar,adstar\") runs each planner in turn on\n");
+    printf("                          the same environment within a single process; the exit\n");
+    printf("                          code is then the number of planners that failed.\n");
     printf("<planner_t>               One of arastar, adstar, rstar, anastar.\n");
     printf("[--search-dir=<search_t>] (optional) Select the type of search to run. The default\n");
     printf("                          is \"backwards\".\n");
     printf("<search_t>                One of backward, forward.\n");
     printf("<env cfg>                 Config file representing the environment configuration.\n");
     printf("                          See sbpl/env_examples/ for examples.\n");
+    printf("[--server]                Serve requests over stdin/stdout until EOF instead of\n");
+    printf("                          running once. Each request line holds the arguments of\n");
+    printf("                          a normal invocation; the reply line is \"RESULT <code>\".\n");
     printf("[mot prim]                (optional) Motion primitives file for x,y,theta lattice\n");
     printf("                          planning. See sbpl/matlab/mprim/ for examples.\n");
     printf("                          NOTE: resolution of motion primtives should match that\n");
@@ -1517,20 +1524,67 @@ int planrobarm(PlannerType plannerType, char* envCfgFilename, bool forwardSearch
 }
 
 /*******************************************************************************
- * main - Parse command line arguments and launch one of the sbpl examples above.
- *        Launch sbpl with just the -h option for usage help.
+ * RunPlanner - Launch the correct example for one planner on the given
+ *              environment file.
+ *
+ * @param planner The planner to run
+ * @param environment The environment type to plan on
+ * @param navigating Whether to run the navigating variant of the example
+ * @param forwardSearch Whether to search forward instead of backward
+ * @param envCfgFilename The environment config file
+ * @param motPrimFilename The motion primitives file, or NULL
+ * @return The example result (1 on success), or -1 if the environment type
+ *         is unsupported
+ *******************************************************************************/
+int RunPlanner(PlannerType planner, EnvironmentType environment, bool navigating, bool forwardSearch,
+               char* envCfgFilename, char* motPrimFilename)
+{
+    int plannerRes = 0;
+    switch (environment) {
+    case ENV_TYPE_2D:
+        if (navigating) {
+            plannerRes = planandnavigate2d(planner, envCfgFilename);
+        }
+        else {
+            plannerRes = plan2d(planner, envCfgFilename, forwardSearch);
+        }
+        break;
+    case ENV_TYPE_2DUU:
+        printf("Warning: planning in two dimensions under uncertainty is not fully implemented!\n");
+        plannerRes = plan2duu(planner, envCfgFilename);
+        break;
+    case ENV_TYPE_XYTHETA:
+        if (navigating) {
+            plannerRes = planandnavigatexythetalat(planner, envCfgFilename, motPrimFilename, forwardSearch);
+        }
+        else {
+            plannerRes = planxythetalat(planner, envCfgFilename, motPrimFilename, forwardSearch);
+        }
+        break;
+    case ENV_TYPE_XYTHETAMLEV:
+        plannerRes = planxythetamlevlat(planner, envCfgFilename, motPrimFilename, forwardSearch);
+        break;
+    case ENV_TYPE_ROBARM:
+        plannerRes = planrobarm(planner, envCfgFilename, forwardSearch);
+        break;
+    default:
+        return -1;
+    }
+    return plannerRes;
+}
+
+/*******************************************************************************
+ * RunRequest - Parse one set of command-line arguments and launch the
+ *              requested example(s). This is the whole per-invocation work of
+ *              main; server mode reuses it for every request line.
  *
  * @param argc The number of command-line arguments
  * @param argv The command-line arguments
+ * @return The result of the run (see MainResultType)
  *******************************************************************************/
-int main(int argc, char *argv[])
+int RunRequest(int argc, char *argv[])
 {
-    // Print help
-    if (argc == 2 && strcmp(argv[1], "-h") == 0) {
-        PrintHelp(argv);
-        return MAIN_RESULT_SUCCESS;
-    }
-    else if (argc < 2) {
+    if (argc < 2) {
         PrintUsage(argv);
         return MAIN_RESULT_INSUFFICIENT_ARGS;
     }
@@ -1559,52 +1613,121 @@ int main(int argc, char *argv[])
 
     int envArgIdx = numOptions + 1;
     EnvironmentType environment = StrToEnvironmentType(environmentType.c_str());
-    PlannerType planner = StrToPlannerType(plannerType.c_str());
     bool forwardSearch = !strcmp(searchDir.c_str(), "forward");
 
     bool usingMotionPrimitives = (argc == numOptions + 3);
     char* motPrimFilename = usingMotionPrimitives ? argv[envArgIdx + 1] : NULL;
 
-    // make sure we've been given valid a valid environment
-    if (environment == INVALID_ENV_TYPE || planner == INVALID_PLANNER_TYPE) {
+    // --planner may be a comma-separated list (e.g. "arastar,adstar"); every
+    // planner in the list is run in turn within this process, amortizing the
+    // process startup across planners that share the same environment file
+    std::vector<PlannerType> planners;
+    std::stringstream plannerStream(plannerType);
+    std::string plannerToken;
+    while (std::getline(plannerStream, plannerToken, ',')) {
+        planners.push_back(StrToPlannerType(plannerToken.c_str()));
+    }
+
+    // make sure we've been given a valid environment and valid planners
+    bool plannersValid = !planners.empty();
+    for (unsigned int i = 0; i < planners.size(); i++) {
+        if (planners[i] == INVALID_PLANNER_TYPE) {
+            plannersValid = false;
+        }
+    }
+    if (environment == INVALID_ENV_TYPE || !plannersValid) {
         PrintUsage(argv);
         return MAIN_RESULT_INCORRECT_OPTIONS;
     }
 
-    // Launch the correct example given the planner and an environment file.
-    int plannerRes = 0;
-    switch (environment) {
-    case ENV_TYPE_2D:
-        if (navigating) {
-            plannerRes = planandnavigate2d(planner, argv[envArgIdx]);
+    // Launch the correct example for every requested planner on the
+    // environment file. With a single planner the exit code keeps its
+    // historical meaning (0 success, 1 failure); with a planner list it is
+    // the number of planners that failed.
+    int numFailures = 0;
+    for (unsigned int i = 0; i < planners.size(); i++) {
+        int plannerRes = RunPlanner(planners[i], environment, navigating, forwardSearch, argv[envArgIdx],
+                                    motPrimFilename);
+        if (plannerRes == -1) {
+            printf("Unsupported Environment Type...\n");
+            PrintUsage(argv);
+            return MAIN_RESULT_UNSUPPORTED_ENV;
         }
-        else {
-            plannerRes = plan2d(planner, argv[envArgIdx], forwardSearch);
+        if (plannerRes != 1) {
+            numFailures++;
         }
-        break;
-    case ENV_TYPE_2DUU:
-        printf("Warning: planning in two dimensions under uncertainty is not fully implemented!\n");
-        plannerRes = plan2duu(planner, argv[envArgIdx]);
-        break;
-    case ENV_TYPE_XYTHETA:
-        if (navigating) {
-            plannerRes = planandnavigatexythetalat(planner, argv[envArgIdx], motPrimFilename, forwardSearch);
+    }
+
+    return numFailures == 0 ? MAIN_RESULT_SUCCESS : numFailures;
+}
+
+/*******************************************************************************
+ * RunServer - Serve planner requests over stdin/stdout until EOF.
+ *
+ * Each request is one line holding the same arguments as a normal command
+ * line (e.g. "--env=2d --planner=arastar --search-dir=forward env1.cfg");
+ * after the run a line "RESULT <code>" is written to stdout, where <code> is
+ * what the exit code of a one-shot invocation would have been. Environment
+ * initialization and process startup are paid once per server rather than
+ * once per request. A request that throws is reported as RESULT 255 and the
+ * server keeps serving.
+ *
+ * @param progName The name of the test executable, used as argv[0] of each
+ *                 request
+ *******************************************************************************/
+int RunServer(char* progName)
+{
+    std::string line;
+    while (std::getline(std::cin, line)) {
+        std::stringstream lineStream(line);
+        std::vector<std::string> tokens;
+        std::string token;
+        while (lineStream >> token) {
+            tokens.push_back(token);
         }
-        else {
-            plannerRes = planxythetalat(planner, argv[envArgIdx], motPrimFilename, forwardSearch);
+        if (tokens.empty()) {
+            continue;
         }
-        break;
-    case ENV_TYPE_XYTHETAMLEV:
-        plannerRes = planxythetamlevlat(planner, argv[envArgIdx], motPrimFilename, forwardSearch);
-        break;
-    case ENV_TYPE_ROBARM:
-        plannerRes = planrobarm(planner, argv[envArgIdx], forwardSearch);
-        break;
-    default:
-        printf("Unsupported Environment Type...\n");
-        PrintUsage(argv);
-        return MAIN_RESULT_UNSUPPORTED_ENV;
+
+        std::vector<char*> requestArgv;
+        requestArgv.push_back(progName);
+        for (unsigned int i = 0; i < tokens.size(); i++) {
+            requestArgv.push_back(&tokens[i][0]);
+        }
+
+        int result;
+        try {
+            result = RunRequest((int)requestArgv.size(), &requestArgv[0]);
+        }
+        catch (const std::exception& e) {
+            printf("ERROR: %s\n", e.what());
+            result = 255;
+        }
+        printf("RESULT %d\n", result);
+        fflush(stdout);
+    }
+    return MAIN_RESULT_SUCCESS;
+}
+
+/*******************************************************************************
+ * main - Parse command line arguments and launch one of the sbpl examples above.
+ *        Launch sbpl with just the -h option for usage help, or with --server
+ *        to serve requests over stdin/stdout.
+ *
+ * @param argc The number of command-line arguments
+ * @param argv The command-line arguments
+ *******************************************************************************/
+int main(int argc, char *argv[])
+{
+    // Print help
+    if (argc == 2 && strcmp(argv[1], "-h") == 0) {
+        PrintHelp(argv);
+        return MAIN_RESULT_SUCCESS;
+    }
+
+    if (argc == 2 && strcmp(argv[1], "--server") == 0) {
+        return RunServer(argv[0]);
     }
 
-    return plannerRes == 1 ? MAIN_RESULT_SUCCESS : MAIN_RESULT_FAILURE;
+    return RunRequest(argc, argv);
 }
@@ -1,12 +1,234 @@
 #!/usr/bin/env python
 
-from sys import argv
-from subprocess import call
-from os import getcwd, chdir, pardir, devnull
-from os.path import join, exists, abspath
+import time
+
+from io import StringIO
+from sys import argv, exit, stdout
+from subprocess import call, DEVNULL
+from os import (getcwd, chdir, cpu_count, environ, devnull, replace,
+                posix_spawn, waitpid, waitstatus_to_exitcode, O_WRONLY,
+                POSIX_SPAWN_OPEN)
+from os.path import exists, getmtime
+from pathlib import Path
+from functools import lru_cache
+from types import SimpleNamespace
+
+__environments__ = ('2d', 'xytheta', 'xythetamlev', 'robarm')
+__search_direction__ = ('forward', 'backward')
+
+NOTES = ('xytheta and xythetamlev environments do not support R* planning',
+         'envrobarm does not support backward search')
+
+# Resolve the sbpl root from the script location once instead of relying on
+# the script being run from sbpl/test/. The exe path is kept as a string
+# since it is spliced into every planner argv.
+sbpl_root = Path(__file__).resolve().parent.parent
+sbpl_exe = str(sbpl_root / 'bin' / 'test_sbpl')
+sbpl_lib = sbpl_root / 'lib' / 'libsbpl.so'
+
+# The same handful of files is probed repeatedly (Makefile, CMakeLists.txt,
+# the test executable and the library); cache the stat results
+_exists = lru_cache(maxsize=None)(exists)
+
+# returncode reported when the planner process cannot be spawned at all
+# (e.g. the executable went missing between the build check and the run)
+_SPAWN_FAILED = -1
+
+# ANSI color prefixes, computed once at import; colors are disabled when
+# stdout is not a terminal (CI logs, piped output)
+_USE_COLOR = stdout.isatty()
+_GREEN = '\033[92;1m' if _USE_COLOR else ''
+_RED = '\033[91;1m' if _USE_COLOR else ''
+_CYAN = '\033[96;1m' if _USE_COLOR else ''
+_END_COLOR = '\033[0m' if _USE_COLOR else ''
+
+def print_success(text, out=stdout):
+    """
+    @brief print a success message in green
+    """
+    out.write(_GREEN + text + _END_COLOR + '\n')
+#end print_success
+
+def print_fail(text, out=stdout):
+    """
+    @brief print a failure message in red
+    """
+    out.write(_RED + text + _END_COLOR + '\n')
+#end print_fail
+
+def print_summary(text, out=stdout):
+    """
+    @brief print a summary line in cyan
+    """
+    out.write(_CYAN + text + _END_COLOR + '\n')
+#end print_summary
+
+def print_environment_title(title, out=stdout):
+    """
+    @brief print a title line for an environment test group
+
+    The titles are single lines, so the underline length is just
+    len(title); no splitting or max() over lines is needed.
+    """
+    out.write('\n')
+    print_summary(title, out)
+    print_summary('=' * len(title), out)
+#end print_environment_title
 
-# This script should only be run from sbpl/test/
-sbpl_root = abspath(pardir)
+def print_search_direction_title(title, out=stdout):
+    """
+    @brief print a title line for a search-direction summary section
+    """
+    print_summary(title, out)
+    print_summary('-' * len(title), out)
+#end print_search_direction_title
+
+# Declarative test matrix. Each case is a (planner, cfg, mprim, navigating)
+# tuple; the environment type and search direction are filled in when the job
+# lists are generated in main. Keeping the matrix in one place is what lets
+# the concurrent runner shard the whole suite as a flat job list.
+
+_ALL_PLANNERS = ('arastar', 'adstar', 'anastar', 'rstar')
+# xytheta and xythetamlev environments do not support R* planning (see NOTES)
+_LATTICE_PLANNERS = ('arastar', 'adstar', 'anastar')
+_NAV_CHOICES = (False, True)
+
+# all planners on 2d env1, plain and navigating, then env2
+# (navigating on env2 skipped, I want my tests to finish)
+_2D_CASES = [(planner, 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', navigating)
+             for navigating in _NAV_CHOICES for planner in _ALL_PLANNERS] + \
+            [(planner, 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', False)
+             for planner in _ALL_PLANNERS]
+
+# all planners on xytheta env1, plain and navigating, then env2
+# (navigating on env2 skipped, i want my tests to finish)
+_XYTHETA_CASES = [(planner, 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', navigating)
+                  for navigating in _NAV_CHOICES for planner in _LATTICE_PLANNERS] + \
+                 [(planner, 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', False)
+                  for planner in _LATTICE_PLANNERS]
+
+# all planners on xythetamlev env1 and env2
+_XYTHETAMLEV_CASES = [(planner, cfg, mprim, False)
+                      for (cfg, mprim) in (('env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim'),
+                                           ('env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim'))
+                      for planner in _LATTICE_PLANNERS]
+
+# all planners on robarm env1, env2 and env3 (forward only, see NOTES)
+_ROBARM_CASES = [(planner, f'env_examples/robarm/env{env_num}_6d.cfg', '', False)
+                 for env_num in (1, 2, 3) for planner in _ALL_PLANNERS]
+
+# which case table backs each environment
+_CASE_TABLES = {'2d': _2D_CASES,
+                'xytheta': _XYTHETA_CASES,
+                'xythetamlev': _XYTHETAMLEV_CASES,
+                'robarm': _ROBARM_CASES}
+
+# the supported (direction, environment) groups; ('backward', 'robarm') is
+# deliberately absent since envrobarm does not support backward search (see
+# NOTES), so the scheduler skips it instead of relying on callers to
+# remember the exception
+DISPATCH = {(direction, env): _CASE_TABLES[env]
+            for direction in __search_direction__
+            for env in __environments__
+            if (direction, env) != ('backward', 'robarm')}
+
+def make_jobs(env_type, cases, is_forward_search):
+    """
+    @brief expand a case table into run_sbpl_test argument tuples
+
+    The cfg and mprim paths are joined with the sbpl root here, once per
+    job, so run_sbpl_test does not rejoin them on every invocation.
+    """
+    return [(env_type, planner, str(sbpl_root / cfg),
+             str(sbpl_root / mprim) if mprim else '', is_forward_search, navigating)
+            for (planner, cfg, mprim, navigating) in cases]
+#end make_jobs
+
+def job_name(job):
+    """
+    @brief build a readable name for one job, e.g. 2d-arastar-env1-forward-nav
+    """
+    env_type, planner_type, test_env, mprim, is_forward_search, navigating = job
+    parts = [env_type, planner_type, Path(test_env).stem,
+             'forward' if is_forward_search else 'backward']
+    if navigating:
+        parts.append('nav')
+    return '-'.join(parts)
+#end job_name
+
+def write_junit_xml(path, records):
+    """
+    @brief write a JUnit XML report from (name, duration, returncode) records
+
+    The report lets CI systems consume per-test results and durations
+    natively instead of scraping the colored summary output. Only the
+    stdlib ElementTree is used, so there are no extra dependencies.
+    """
+    import xml.etree.ElementTree as ElementTree
+
+    num_failures = sum(1 for (_, _, rc) in records if rc != 0)
+    suite = ElementTree.Element('testsuite', name='sbpl', tests=str(len(records)),
+                                failures=str(num_failures))
+    for name, duration, rc in records:
+        case = ElementTree.SubElement(suite, 'testcase', name=name,
+                                      time=f'{duration:.3f}')
+        if rc != 0:
+            ElementTree.SubElement(case, 'failure',
+                                   message=f'planner exited with code {rc}')
+    ElementTree.ElementTree(suite).write(path, encoding='utf-8', xml_declaration=True)
+#end write_junit_xml
+
+def parse_args():
+    """
+    @brief parse the command line, skipping argparse for the default full suite
+
+    Building an ArgumentParser costs a few milliseconds at startup; when no
+    arguments are given (the common case in CI) the defaults are used
+    directly and argparse is not even imported. The environment and
+    search-direction selections come back as frozensets, so a typo is
+    rejected at parse time instead of silently matching nothing and the
+    membership checks in main are O(1).
+    """
+    if len(argv) == 1:
+        return SimpleNamespace(environment=frozenset(__environments__),
+                               search_direction=frozenset(__search_direction__),
+                               rebuild=False, junit_xml=None, jobs=None, cache=False,
+                               batch_size=None, quiet=False, balance='fifo', server=False)
+
+    import argparse
+    parser = argparse.ArgumentParser(description='Build SBPL and run the planner test suite.')
+    parser.add_argument('--environment', nargs='*', choices=__environments__,
+                        default=list(__environments__),
+                        help='environments to test (default: all of them)')
+    parser.add_argument('--search-direction', dest='search_direction', nargs='*',
+                        choices=__search_direction__, default=list(__search_direction__),
+                        help='search directions to test (default: both)')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='force a clean rebuild of SBPL before testing')
+    parser.add_argument('--junit-xml', dest='junit_xml', metavar='PATH', default=None,
+                        help='write a JUnit XML report of the run to PATH')
+    parser.add_argument('--jobs', type=int, metavar='N', default=None,
+                        help='number of planner processes to keep in flight '
+                             '(default: number of cpus minus two)')
+    parser.add_argument('--quiet', action='store_true',
+                        help='suppress the NOTES banner and build chatter')
+    parser.add_argument('--batch-size', dest='batch_size', type=int, metavar='N', default=None,
+                        help='maximum planners handed to one test_sbpl invocation '
+                             '(default: all planners sharing an environment config)')
+    parser.add_argument('--server', action='store_true',
+                        help='run tests on persistent test_sbpl --server processes '
+                             'instead of one process per invocation')
+    parser.add_argument('--balance', choices=('fifo', 'lpt'), default='fifo',
+                        help='batch start order: submission order, or longest '
+                             'first using the durations from the previous run')
+    parser.add_argument('--cache', action=argparse.BooleanOptionalAction, default=False,
+                        help='reuse planner results memoized on disk when the '
+                             'inputs and the test executable are unchanged')
+    args = parser.parse_args()
+    args.environment = frozenset(args.environment)
+    args.search_direction = frozenset(args.search_direction)
+    return args
+#end parse_args
 
 def generate_makefile(dir=''):
     """
@@ -19,341 +241,552 @@ def generate_makefile(dir=''):
     @return Whether or not a Makefile was generated
     """
     # try to generate Makefile if one doesn't exist
-    cwd = join(getcwd(), dir)
-    print 'Looking for Makefile in', cwd
-    if not exists(join(cwd, 'Makefile')):
-        if not exists(join(cwd, 'CMakeLists.txt')):
+    cwd = Path(getcwd()) / dir
+    print('Looking for Makefile in', cwd)
+    if not _exists(cwd / 'Makefile'):
+        if not _exists(cwd / 'CMakeLists.txt'):
             return False
         else:
-            print 'No Makefile found for SBPL, running cmake'
+            print('No Makefile found for SBPL, running cmake')
             call(['cmake', '.'])
-        return exists(join(cwd, 'Makefile'))
+        return exists(cwd / 'Makefile')
 #end generate_makefile
 
+def _spawn_sbpl(args):
+    """
+    @brief launch one test_sbpl invocation with posix_spawn and wait for it
+
+    posix_spawn skips fork's copy-on-write duplication of the parent's
+    page tables; the planner's stdout and stderr are pointed at /dev/null
+    through spawn file actions instead of inherited pipes.
+
+    @return the planner's exit code
+    """
+    file_actions = ((POSIX_SPAWN_OPEN, 1, devnull, O_WRONLY, 0),
+                    (POSIX_SPAWN_OPEN, 2, devnull, O_WRONLY, 0))
+    pid = posix_spawn(args[0], args, environ, file_actions=file_actions)
+    _, status = waitpid(pid, 0)
+    return waitstatus_to_exitcode(status)
+#end _spawn_sbpl
+
 def run_sbpl_test(env_type, planner_type, test_env, mprim, is_forward_search, navigating=False):
     """
     @brief run the sbpl test executable
+
+    test_env and mprim are expected to be already-joined paths (see
+    make_jobs); mprim may be empty for environments without primitives.
     """
-    sbpl_exe = join(sbpl_root, 'bin/test_sbpl')
+    args = make_sbpl_args(env_type, planner_type, test_env, mprim, is_forward_search, navigating)
 
-    devnull_fd = open(devnull) # for surpressing output
+    # perf_counter is monotonic, so the measurement cannot be skewed by
+    # clock adjustments during long CI runs
+    start_time = time.perf_counter()
 
-    test_env_path = join(sbpl_root, test_env)
-    mprim_path = join(sbpl_root, mprim)
-    print
-    print 'Running', planner_type, 'planner on', env_type, 'environment'
-    print 'Navigating =', navigating
-    print 'Test environment =', test_env
-    print 'Motion primitives =', mprim
+    # args is passed as a list, so no shell is involved; the planner output
+    # is surpressed
+    try:
+        sbpl_res = _spawn_sbpl(args)
+    except OSError:
+        sbpl_res = _SPAWN_FAILED
 
-    forward_search_arg = ''
-    if is_forward_search:
-        forward_search_arg = 'forward'
-    else:
-        forward_search_arg = 'backward'
+    duration = time.perf_counter() - start_time
+    print_test_report((env_type, planner_type, test_env, mprim, is_forward_search, navigating),
+                      sbpl_res, duration)
+
+    return sbpl_res
+#end run_sbpl_test
 
-    args = [sbpl_exe, '--env=' + env_type, '--planner=' + planner_type, '--search-dir=' + forward_search_arg, test_env_path, mprim_path]
+def make_sbpl_args(env_type, planner_type, test_env, mprim, is_forward_search, navigating):
+    """
+    @brief build the test_sbpl argument list for one invocation
+    """
+    forward_search_arg = 'forward' if is_forward_search else 'backward'
+
+    args = [sbpl_exe, '--env=' + env_type, '--planner=' + planner_type, '--search-dir=' + forward_search_arg, test_env, mprim]
     if mprim == '': args.pop()
     if navigating: args.insert(1, '-s')
-    for arg in args: print arg,
-    print
+    return args
+#end make_sbpl_args
 
-    import time	
-    start_time = time.time()
+# on-disk memoization of planner results; developer iterations skip every
+# invocation whose inputs and executable are unchanged since the last run
+_CACHE_DIR = Path.home() / '.cache' / 'sbpl_tests'
 
-    sbpl_res = call(args, stdout=devnull_fd, stderr=devnull_fd)
+def _cache_path(sbpl_args):
+    """
+    @brief map one test_sbpl invocation to its cache file
+
+    The key hashes the bytes of the input files named in the argument list
+    (cfg and mprim), the argument list itself and the mtime of the test
+    executable, so rebuilding the exe or touching an input invalidates the
+    entry. The files are memory-mapped and fed to the hash through the
+    buffer protocol, avoiding a userspace copy of multi-MB mprim files; 16
+    digest bytes are plenty for a cache key.
+    """
+    import hashlib
+    import mmap
+
+    digest = hashlib.blake2b(digest_size=16)
+    for arg in sbpl_args[1:]:
+        if _exists(arg):
+            with open(arg, 'rb') as input_file:
+                try:
+                    with mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        digest.update(mapped)
+                except ValueError:
+                    pass  # zero-length files cannot be mapped and hash to nothing
+    digest.update(b'\0'.join(arg.encode() for arg in sbpl_args))
+    digest.update(str(getmtime(sbpl_args[0])).encode())
+    return _CACHE_DIR / (digest.hexdigest() + '.json')
+#end _cache_path
+
+def _cached_result(cache_file):
+    """
+    @brief return the stored (returncode, duration), or None on any miss
+    """
+    import json
 
-    end_time = time.time()
-    print 'Planning took', end_time - start_time, 'seconds.'
+    try:
+        with open(cache_file) as stored_file:
+            stored = json.load(stored_file)
+        return stored['returncode'], stored['duration']
+    except (OSError, ValueError, KeyError):
+        return None
+#end _cached_result
 
-    green_color = '\033[92;1m'
-    red_color = '\033[91;1m'
-    end_color = '\033[0m'
-    if sbpl_res == 0:
-        print green_color + 'Planning succeeded.' + end_color
+def _store_result(cache_file, rc, duration):
+    """
+    @brief record one planner result for later runs
+    """
+    import json
+
+    _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(cache_file, 'w') as stored_file:
+        json.dump({'returncode': rc, 'duration': duration}, stored_file)
+#end _store_result
+
+def _load_timings():
+    """
+    @brief load the per-batch durations recorded by earlier runs
+    """
+    import json
+
+    try:
+        with open(_CACHE_DIR / 'timings.json') as timings_file:
+            return json.load(timings_file)
+    except (OSError, ValueError):
+        return {}
+#end _load_timings
+
+def _store_timings(timings):
+    """
+    @brief persist per-batch durations for the next run
+
+    The file is written to a temp name and moved into place, so a run
+    killed mid-write cannot leave a truncated timings file behind.
+    """
+    import json
+
+    _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = _CACHE_DIR / 'timings.json.tmp'
+    with open(tmp_path, 'w') as timings_file:
+        json.dump(timings, timings_file)
+    replace(tmp_path, _CACHE_DIR / 'timings.json')
+#end _store_timings
+
+def print_test_report(job, rc, duration):
+    """
+    @brief print the report block for one finished test invocation
+
+    The whole block is printed after the planner exits; with several
+    planners in flight at once this keeps each report contiguous instead
+    of interleaving announcements and results.
+    """
+    env_type, planner_type, test_env, mprim, is_forward_search, navigating = job
+    buf = StringIO()
+    print(file=buf)
+    print('Ran', planner_type, 'planner on', env_type, 'environment', file=buf)
+    print('Navigating =', navigating, file=buf)
+    print('Test environment =', test_env, file=buf)
+    print('Motion primitives =', mprim, file=buf)
+    print(' '.join(make_sbpl_args(*job)), file=buf)
+    print(f'Planning took {duration:.3f} seconds.', file=buf)
+    if rc == 0:
+        print_success('Planning succeeded.', buf)
+    elif rc == _SPAWN_FAILED:
+        print_fail('Planner could not be started.', buf)
     else:
-        print red_color + 'Planner failed with exit code' + end_color, sbpl_res
-    print
+        print_fail(f'Planner failed with exit code {rc}', buf)
+    print(file=buf)
+    # one write per report keeps the block contiguous on the tty and turns
+    # a dozen write syscalls into one
+    stdout.write(buf.getvalue())
+#end print_test_report
+
+async def _run_sbpl_test_async(semaphore, job, use_cache=False):
+    """
+    @brief run one test_sbpl invocation as an asyncio subprocess
 
-    devnull_fd.close()
+    The subprocess wait yields to the event loop, so a single Python
+    process keeps up to the semaphore's worth of planners in flight with
+    no worker processes of its own. With use_cache, a result memoized from
+    an earlier run with identical inputs is returned without spawning.
 
-    return sbpl_res
-#end run_sbpl_test
+    @return (returncode, elapsed seconds) for the invocation
+    """
+    args = make_sbpl_args(*job)
+
+    cache_file = _cache_path(args) if use_cache else None
+    if cache_file is not None:
+        cached = _cached_result(cache_file)
+        if cached is not None:
+            rc, duration = cached
+            print_test_report(job, rc, duration)
+            return rc, duration
+
+    import asyncio
+
+    async with semaphore:
+        start_time = time.perf_counter()
+        try:
+            proc = await asyncio.create_subprocess_exec(*args, stdout=DEVNULL, stderr=DEVNULL)
+            rc = await proc.wait()
+        except OSError:
+            rc = _SPAWN_FAILED
+        duration = time.perf_counter() - start_time
+
+    if cache_file is not None and rc != _SPAWN_FAILED:
+        _store_result(cache_file, rc, duration)
+    print_test_report(job, rc, duration)
+    return rc, duration
+#end _run_sbpl_test_async
+
+def batched(iterable, n):
+    """
+    @brief yield successive lists of at most n items (itertools recipe)
+    """
+    from itertools import islice
 
-if __name__ == '__main__':
-    print "SBPL is located at", sbpl_root
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, n)):
+        yield batch
+#end batched
+
+class SbplWorker:
+    """
+    @brief a persistent test_sbpl --server subprocess
+
+    The worker feeds one request line per invocation down the server's
+    stdin and reads back its RESULT line, so the executable's startup cost
+    is paid once per worker instead of once per test. The planner chatter
+    on the server's stdout is skipped while looking for the result.
+    """
+    def __init__(self):
+        from subprocess import Popen, PIPE
+        self.proc = Popen([sbpl_exe, '--server'], stdin=PIPE, stdout=PIPE,
+                          stderr=DEVNULL, text=True, bufsize=1)
+    #end __init__
+
+    def run(self, sbpl_args):
+        """
+        @brief run one invocation's arguments on the server
+
+        @return the code a one-shot invocation would have exited with
+        """
+        print(' '.join(sbpl_args[1:]), file=self.proc.stdin, flush=True)
+        for line in self.proc.stdout:
+            if line.startswith('RESULT '):
+                return int(line.split()[1])
+        return _SPAWN_FAILED
+    #end run
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass  # the pipe is already broken when the server crashed
+        self.proc.wait()
+    #end close
+#end SbplWorker
+
+def make_batched_jobs(jobs, batch_size=None):
+    """
+    @brief group jobs that share (env, cfg, mprim, direction, navigating)
+
+    All planners of one group are handed to a single test_sbpl invocation as
+    a comma-separated --planner list, amortizing process startup and config
+    parsing across the group. The exit code of such an invocation is the
+    number of planners that failed (0 meaning all succeeded). batch_size
+    caps the planners per invocation; smaller batches trade startup
+    amortization for more parallelism across the worker pool.
+    """
+    groups = {}
+    for (env_type, planner, cfg, mprim, is_forward_search, navigating) in jobs:
+        groups.setdefault((env_type, cfg, mprim, is_forward_search, navigating), []).append(planner)
+    return [(env_type, ','.join(chunk), cfg, mprim, is_forward_search, navigating)
+            for (env_type, cfg, mprim, is_forward_search, navigating), planners in groups.items()
+            for chunk in batched(planners, batch_size or len(planners))]
+#end make_batched_jobs
+
+def _count_group(jobs, batches, batch_results, records=None):
+    """
+    @brief reduce per-batch returncodes into a (succeeded, all) pair
+
+    When a records list is given, a (name, duration, returncode) record is
+    appended per invocation for later reporting.
+    """
+    failures = 0
+    for batch, (rc, duration) in zip(batches, batch_results):
+        size = batch[1].count(',') + 1
+        # the returncode of a batch is its number of failed planners; a
+        # crash (signal, bad invocation) fails the whole batch
+        failures += rc if 0 <= rc <= size else size
+        if records is not None:
+            records.append((job_name(batch), duration, rc))
+    return len(jobs) - failures, len(jobs)
+#end _count_group
+
+def _run_batches_on_servers(batches, max_workers, use_cache):
+    """
+    @brief run batches on a pool of persistent test_sbpl servers
+
+    One SbplWorker is lazily created per pool thread, so up to max_workers
+    long-lived server processes each serve a stream of requests; blocking
+    on pipe I/O happens in the threads while the planners do the work.
+
+    @return the (returncode, duration) pairs in batch order
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from threading import local
+
+    thread_state = local()
+    workers = []
+
+    def _run(batch):
+        worker = getattr(thread_state, 'worker', None)
+        if worker is None:
+            try:
+                worker = thread_state.worker = SbplWorker()
+            except OSError:
+                return _SPAWN_FAILED, 0.0
+            workers.append(worker)
+        args = make_sbpl_args(*batch)
+
+        cache_file = _cache_path(args) if use_cache else None
+        if cache_file is not None:
+            cached = _cached_result(cache_file)
+            if cached is not None:
+                print_test_report(batch, *cached)
+                return cached
+
+        start_time = time.perf_counter()
+        try:
+            rc = worker.run(args)
+        except (OSError, ValueError):
+            rc = _SPAWN_FAILED
+        duration = time.perf_counter() - start_time
+
+        if rc == _SPAWN_FAILED:
+            # a crashed server (broken pipe or EOF before a RESULT line)
+            # would fail every later batch on this thread; drop it so the
+            # next batch respawns a fresh one
+            worker.close()
+            workers.remove(worker)
+            thread_state.worker = None
+
+        if cache_file is not None and rc != _SPAWN_FAILED:
+            _store_result(cache_file, rc, duration)
+        print_test_report(batch, rc, duration)
+        return rc, duration
+    #end _run
+
+    with ThreadPoolExecutor(max_workers) as pool:
+        results = list(pool.map(_run, batches))
+    for worker in workers:
+        worker.close()
+    return results
+#end _run_batches_on_servers
+
+def run_groups(groups, max_workers, records=None, use_cache=False, batch_size=None,
+               balance='fifo', use_server=False):
+    """
+    @brief run several test groups concurrently under one event loop
+
+    groups is a list of (key, jobs) pairs; the groups are independent
+    (different cfg/mprim inputs, different exe invocations), so all their
+    batches go into one asyncio.gather throttled by a single semaphore. The
+    suite then finishes in roughly the time of its slowest batches rather
+    than the sum of serial group waits.
+
+    With balance='lpt' the batches are started longest-first using the
+    durations recorded by the previous run, so one slow planner batch
+    cannot strand the tail of the pool behind a queue of quick ones. With
+    use_server the batches go to persistent test_sbpl --server processes
+    instead of one subprocess per invocation.
+
+    @return dict mapping each key to its (succeeded, all) pair
+    """
+    batched_groups = [(key, jobs, make_batched_jobs(jobs, batch_size)) for key, jobs in groups]
+    flat = [batch for (_, _, batches) in batched_groups for batch in batches]
+
+    timings = _load_timings()
+    if balance == 'lpt':
+        # greedy longest-processing-time-first; unseen batches get a
+        # neutral estimate of one second
+        flat.sort(key=lambda batch: timings.get(job_name(batch), 1.0), reverse=True)
+
+    if use_server:
+        flat_results = _run_batches_on_servers(flat, max_workers, use_cache)
+    else:
+        # asyncio is only needed by the event-loop path, and only once a run
+        # is actually launched; importing the module at top level would charge
+        # every pytest collection and --server run for it
+        import asyncio
+
+        async def _run_batches():
+            semaphore = asyncio.Semaphore(max_workers)
+            return await asyncio.gather(*(_run_sbpl_test_async(semaphore, batch, use_cache)
+                                          for batch in flat))
+
+        # the semaphore wakes waiters in creation order, so gathering in
+        # flat order is what realizes the chosen schedule
+        flat_results = asyncio.run(_run_batches())
+    result_by_batch = dict(zip(flat, flat_results))
+
+    results = {}
+    for key, jobs, batches in batched_groups:
+        batch_results = [result_by_batch[batch] for batch in batches]
+        results[key] = _count_group(jobs, batches, batch_results, records)
+
+    timings.update((job_name(batch), duration)
+                   for batch, (_, duration) in result_by_batch.items())
+    _store_timings(timings)
+    return results
+#end run_groups
+
+def run_suite(jobs, max_workers, records=None):
+    """
+    @brief run one batch of independent sbpl tests concurrently
+
+    @return (number of tests that succeeded, number of tests run)
+    """
+    return run_groups([(None, jobs)], max_workers, records)[None]
+#end run_suite
+
+def main():
+    args = parse_args()
+
+    # parse_args already returns the selections as frozensets, validated
+    # against the known environments and directions
+    env_set = args.environment
+    dir_set = args.search_direction
+
+    # the banner is informational only; --quiet keeps CI logs to the
+    # reports and summaries
+    if not args.quiet:
+        buf = StringIO()
+        for note in NOTES:
+            print_summary('* ' + note, buf)
+        print('SBPL is located at', sbpl_root, file=buf)
+        stdout.write(buf.getvalue())
 
     chdir(sbpl_root)
 
-    makefile_exists = generate_makefile()
+    # fast path: skip the cmake and make steps entirely when the binaries
+    # exist and are newer than CMakeLists.txt; --rebuild still forces a build
+    cmakelists = sbpl_root / 'CMakeLists.txt'
+    up_to_date = not args.rebuild and \
+                 _exists(sbpl_exe) and _exists(sbpl_lib) and \
+                 _exists(cmakelists) and getmtime(cmakelists) <= getmtime(sbpl_exe)
 
     make_result = 0
-    # build SBPL
-    if makefile_exists:
-        if 'rebuild' in argv: call(['make', 'clean'])
-        make_result = call(['make'])
+    if up_to_date:
+        if not args.quiet:
+            print('SBPL binaries are up to date, skipping build')
     else:
-        print 'No Makefile or CMakeLists.txt found. Attempting to run tests without building'
+        makefile_exists = generate_makefile()
+
+        # build SBPL
+        if makefile_exists:
+            if args.rebuild: call(['make', 'clean'])
+            make_result = call(['make'])
+        else:
+            print('No Makefile or CMakeLists.txt found. Attempting to run tests without building')
 
-    if make_result != 0:
-        print 'Errors building SBPL. Checking for older version of SBPL...'
+        if make_result != 0:
+            print('Errors building SBPL. Checking for older version of SBPL...')
 
 
-    sbpl_exists = exists(join(sbpl_root, 'bin/test_sbpl')) and \
-                  exists(join(sbpl_root, 'lib/libsbpl.so'))
+    # probed uncached: the fast-path check above may have cached False for
+    # binaries that the build just created
+    sbpl_exists = exists(sbpl_exe) and exists(sbpl_lib)
 
     if not sbpl_exists:
-        print 'Could not build SBPL and SBPL is not already pre-built. Aborting tests'
-        exit()
-    else:
-        print 'SBPL library and test executable built. Proceeding with tests.'
-
-    num_2d_test_successes = 0
-
-    ### PLANNING FOR 2D ENVIRONMENTS ###
-
-    # all planners on 2d environment (12 tests) env1
-    if run_sbpl_test('2d', 'arastar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', True) == 0:
-        num_2d_test_successes = num_2d_test_successes + 1
-    if run_sbpl_test('2d', 'adstar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', True) == 0:
-        num_2d_test_successes = num_2d_test_successes + 1
-    if run_sbpl_test('2d', 'anastar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', True) == 0:
-        num_2d_test_successes = num_2d_test_successes + 1
-    if run_sbpl_test('2d', 'rstar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', True) == 0:
-        num_2d_test_successes = num_2d_test_successes + 1
-
-    # all planners navigating on 2d env1
-    if run_sbpl_test('2d', 'arastar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', True, True) == 0:
-        num_2d_test_successes = num_2d_test_successes + 1
-    if run_sbpl_test('2d', 'adstar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', True, True) == 0:
-        num_2d_test_successes = num_2d_test_successes + 1
-    if run_sbpl_test('2d', 'anastar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', True, True) == 0:
-        num_2d_test_successes = num_2d_test_successes + 1
-    if run_sbpl_test('2d', 'rstar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', True, True) == 0:
-        num_2d_test_successes = num_2d_test_successes + 1
-
-    # all planners on 2d env2
-    if run_sbpl_test('2d', 'arastar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', True) == 0:
-        num_2d_test_successes = num_2d_test_successes + 1
-    if run_sbpl_test('2d', 'adstar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', True) == 0:
-        num_2d_test_successes = num_2d_test_successes + 1
-    if run_sbpl_test('2d', 'anastar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', True) == 0:
-        num_2d_test_successes = num_2d_test_successes + 1
-    if run_sbpl_test('2d', 'rstar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', True) == 0:
-        num_2d_test_successes = num_2d_test_successes + 1
-
-    # all planners navigating on 2d env2 (no thanks, I want my tests to finish)
-    #run_sbpl_test('2d', 'arastar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', True)
-    #run_sbpl_test('2d', 'adstar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', True)
-    #run_sbpl_test('2d', 'anastar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', True)
-    #run_sbpl_test('2d', 'rstar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', True)
-
-    ### PLANNING FOR (X,Y,THETA) ENVIRONMENTS (9 tests) ###
-
-    num_xytheta_test_successes = 0
-
-    # all planners on xytheta env1
-    if run_sbpl_test('xytheta', 'arastar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', True) == 0:
-        num_xytheta_test_successes = num_xytheta_test_successes + 1
-    if run_sbpl_test('xytheta', 'adstar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', True) == 0:
-        num_xytheta_test_successes = num_xytheta_test_successes + 1
-    if run_sbpl_test('xytheta', 'anastar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', True) == 0:
-        num_xytheta_test_successes = num_xytheta_test_successes + 1
-
-    # all planners navigating on xytheta env1
-    if run_sbpl_test('xytheta', 'arastar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', True, True) == 0:
-        num_xytheta_test_successes = num_xytheta_test_successes + 1
-    if run_sbpl_test('xytheta', 'adstar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', True, True) == 0:
-        num_xytheta_test_successes = num_xytheta_test_successes + 1
-    if run_sbpl_test('xytheta', 'anastar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', True, True) == 0:
-        num_xytheta_test_successes = num_xytheta_test_successes + 1
-
-    # all planners on xytheta env2
-    if run_sbpl_test('xytheta', 'arastar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', True) == 0:
-        num_xytheta_test_successes = num_xytheta_test_successes + 1
-    if run_sbpl_test('xytheta', 'adstar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', True) == 0:
-        num_xytheta_test_successes = num_xytheta_test_successes + 1
-    if run_sbpl_test('xytheta', 'anastar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', True) == 0:
-        num_xytheta_test_successes = num_xytheta_test_successes + 1
-
-    # all planners navigating on xytheta env2 (no thanks, i want my tests to finish)
-    #run_sbpl_test('xytheta', 'arastar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', True)
-    #run_sbpl_test('xytheta', 'adstar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', True)
-    #run_sbpl_test('xytheta', 'anstar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', True)
-
-    ### PLANNING FOR (X,Y,THETA,LEV) ENVIRONMENTS (6 tests) ###
-
-    num_xythetamlev_test_successes = 0
-
-    # all planners on xythetamlev env1
-    if run_sbpl_test('xythetamlev', 'arastar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', True) == 0:
-        num_xythetamlev_test_successes = num_xythetamlev_test_successes + 1
-    if run_sbpl_test('xythetamlev', 'adstar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', True) == 0:
-        num_xythetamlev_test_successes = num_xythetamlev_test_successes + 1
-    if run_sbpl_test('xythetamlev', 'anastar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', True) == 0:
-        num_xythetamlev_test_successes = num_xythetamlev_test_successes + 1
-
-    # all planners on xythetamlev env2
-    if run_sbpl_test('xythetamlev', 'arastar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', True) == 0:
-        num_xythetamlev_test_successes = num_xythetamlev_test_successes + 1
-    if run_sbpl_test('xythetamlev', 'adstar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', True) == 0:
-        num_xythetamlev_test_successes = num_xythetamlev_test_successes + 1
-    if run_sbpl_test('xythetamlev', 'anastar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', True) == 0:
-        num_xythetamlev_test_successes = num_xythetamlev_test_successes + 1
-
-    ### PLANNING FOR ROBARM ENVIRONMENTS (12 tests) ###
-
-    num_robarm_test_successes = 0
-
-    # all planners on robarm env1
-    if run_sbpl_test('robarm', 'arastar', 'env_examples/robarm/env1_6d.cfg', '', True) == 0:
-        num_robarm_test_successes = num_robarm_test_successes + 1
-    if run_sbpl_test('robarm', 'adstar', 'env_examples/robarm/env1_6d.cfg', '', True) == 0:
-        num_robarm_test_successes = num_robarm_test_successes + 1
-    if run_sbpl_test('robarm', 'anastar', 'env_examples/robarm/env1_6d.cfg', '', True) == 0:
-        num_robarm_test_successes = num_robarm_test_successes + 1
-    if run_sbpl_test('robarm', 'rstar', 'env_examples/robarm/env1_6d.cfg', '', True) == 0:
-        num_robarm_test_successes = num_robarm_test_successes + 1
-    
-    # all planners on robarm env2
-    if run_sbpl_test('robarm', 'arastar', 'env_examples/robarm/env2_6d.cfg', '', True) == 0:
-        num_robarm_test_successes = num_robarm_test_successes + 1
-    if run_sbpl_test('robarm', 'adstar', 'env_examples/robarm/env2_6d.cfg', '', True) == 0:
-        num_robarm_test_successes = num_robarm_test_successes + 1
-    if run_sbpl_test('robarm', 'anastar', 'env_examples/robarm/env2_6d.cfg', '', True) == 0:
-        num_robarm_test_successes = num_robarm_test_successes + 1
-    if run_sbpl_test('robarm', 'rstar', 'env_examples/robarm/env2_6d.cfg', '', True) == 0:
-        num_robarm_test_successes = num_robarm_test_successes + 1
-
-    # all planners on robarm env3
-    if run_sbpl_test('robarm', 'arastar', 'env_examples/robarm/env3_6d.cfg', '', True) == 0:
-        num_robarm_test_successes = num_robarm_test_successes + 1
-    if run_sbpl_test('robarm', 'adstar', 'env_examples/robarm/env3_6d.cfg', '', True) == 0:
-        num_robarm_test_successes = num_robarm_test_successes + 1
-    if run_sbpl_test('robarm', 'anastar', 'env_examples/robarm/env3_6d.cfg', '', True) == 0:
-        num_robarm_test_successes = num_robarm_test_successes + 1
-    if run_sbpl_test('robarm', 'rstar', 'env_examples/robarm/env3_6d.cfg', '', True) == 0:
-        num_robarm_test_successes = num_robarm_test_successes + 1
-
-
-    ###### RUN ALL TESTS WITH BACKWARD SEARCH NOW ######
-
-    ### PLANNING FOR 2D ENVIRONMENTS ###
-
-    num_b_2d_test_successes = 0
-
-    # all planners on 2d environment (12 tests) env1
-    if run_sbpl_test('2d', 'arastar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', False) == 0:
-        num_b_2d_test_successes = num_b_2d_test_successes + 1
-    if run_sbpl_test('2d', 'adstar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', False) == 0:
-        num_b_2d_test_successes = num_b_2d_test_successes + 1
-    if run_sbpl_test('2d', 'anastar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', False) == 0:
-        num_b_2d_test_successes = num_b_2d_test_successes + 1
-    if run_sbpl_test('2d', 'rstar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', False) == 0:
-        num_b_2d_test_successes = num_b_2d_test_successes + 1
-
-    # all planners navigating on 2d env1
-    if run_sbpl_test('2d', 'arastar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', False, True) == 0:
-        num_b_2d_test_successes = num_b_2d_test_successes + 1
-    if run_sbpl_test('2d', 'adstar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', False, True) == 0:
-        num_b_2d_test_successes = num_b_2d_test_successes + 1
-    if run_sbpl_test('2d', 'anastar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', False, True) == 0:
-        num_b_2d_test_successes = num_b_2d_test_successes + 1
-    if run_sbpl_test('2d', 'rstar', 'env_examples/nav2d/env1.cfg', 'matlab/mprim/pr2.mprim', False, True) == 0:
-        num_b_2d_test_successes = num_b_2d_test_successes + 1
-
-    # all planners on 2d env2
-    if run_sbpl_test('2d', 'arastar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', False) == 0:
-        num_b_2d_test_successes = num_b_2d_test_successes + 1
-    if run_sbpl_test('2d', 'adstar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', False) == 0:
-        num_b_2d_test_successes = num_b_2d_test_successes + 1
-    if run_sbpl_test('2d', 'anastar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', False) == 0:
-        num_b_2d_test_successes = num_b_2d_test_successes + 1
-    if run_sbpl_test('2d', 'rstar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', False) == 0:
-        num_b_2d_test_successes = num_b_2d_test_successes + 1
-
-    # all planners navigating on 2d env2 (no thanks, I want my tests to finish)
-    #run_sbpl_test('2d', 'arastar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', False)
-    #run_sbpl_test('2d', 'adstar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', False)
-    #run_sbpl_test('2d', 'anastar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', False)
-    #run_sbpl_test('2d', 'rstar', 'env_examples/nav2d/env2.cfg', 'matlab/mprim/pr2.mprim', False)
-
-    ### PLANNING FOR (X,Y,THETA) ENVIRONMENTS (9 tests) ###
-
-    num_b_xytheta_test_successes = 0
-
-    # all planners on xytheta env1
-    if run_sbpl_test('xytheta', 'arastar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', False) == 0:
-        num_b_xytheta_test_successes = num_b_xytheta_test_successes + 1
-    if run_sbpl_test('xytheta', 'adstar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', False) == 0:
-        num_b_xytheta_test_successes = num_b_xytheta_test_successes + 1
-    if run_sbpl_test('xytheta', 'anastar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', False) == 0:
-        num_b_xytheta_test_successes = num_b_xytheta_test_successes + 1
-
-    # all planners navigating on xytheta env1
-    if run_sbpl_test('xytheta', 'arastar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', False, False) == 0:
-        num_b_xytheta_test_successes = num_b_xytheta_test_successes + 1
-    if run_sbpl_test('xytheta', 'adstar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', False, False) == 0:
-        num_b_xytheta_test_successes = num_b_xytheta_test_successes + 1
-    if run_sbpl_test('xytheta', 'anastar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', False, False) == 0:
-        num_b_xytheta_test_successes = num_b_xytheta_test_successes + 1
-
-    # all planners on xytheta env2
-    if run_sbpl_test('xytheta', 'arastar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', False) == 0:
-        num_b_xytheta_test_successes = num_b_xytheta_test_successes + 1
-    if run_sbpl_test('xytheta', 'adstar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', False) == 0:
-        num_b_xytheta_test_successes = num_b_xytheta_test_successes + 1
-    if run_sbpl_test('xytheta', 'anastar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', False) == 0:
-        num_b_xytheta_test_successes = num_b_xytheta_test_successes + 1
-
-    # all planners navigating on xytheta env2 (no thanks, i want my tests to finish)
-    #run_sbpl_test('xytheta', 'arastar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', False)
-    #run_sbpl_test('xytheta', 'adstar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', False)
-    #run_sbpl_test('xytheta', 'anstar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', False)
-
-    ### PLANNING FOR (X,Y,THETA,LEV) ENVIRONMENTS (6 tests) ###
-
-    num_b_xythetamlev_test_successes = 0
-
-    # all planners on xythetamlev env1
-    if run_sbpl_test('xythetamlev', 'arastar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', False) == 0:
-        num_b_xythetamlev_test_successes = num_b_xythetamlev_test_successes + 1
-    if run_sbpl_test('xythetamlev', 'adstar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', False) == 0:
-        num_b_xythetamlev_test_successes = num_b_xythetamlev_test_successes + 1
-    if run_sbpl_test('xythetamlev', 'anastar', 'env_examples/nav3d/env1.cfg', 'matlab/mprim/pr2.mprim', False) == 0:
-        num_b_xythetamlev_test_successes = num_b_xythetamlev_test_successes + 1
-
-    # all planners on xythetamlev env2
-    if run_sbpl_test('xythetamlev', 'arastar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', False) == 0:
-        num_b_xythetamlev_test_successes = num_b_xythetamlev_test_successes + 1
-    if run_sbpl_test('xythetamlev', 'adstar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', False) == 0:
-        num_b_xythetamlev_test_successes = num_b_xythetamlev_test_successes + 1
-    if run_sbpl_test('xythetamlev', 'anastar', 'env_examples/nav3d/env2.cfg', 'matlab/mprim/pr2_10cm.mprim', False) == 0:
-        num_b_xythetamlev_test_successes = num_b_xythetamlev_test_successes + 1
-
-    print '\033[96;1m', 'Forward search results', '\033[0m'
-    print '\033[96;1m', '----------------------', '\033[0m'
-    print '\033[96;1m', num_2d_test_successes, 'out of', 12, '2d tests succeeded', '\033[0m'
-    print '\033[96;1m', num_xytheta_test_successes, 'out of', 9, 'xytheta tests succeeded.', '\033[0m'
-    print '\033[96;1m', num_xythetamlev_test_successes, 'out of', 6, 'xythetamlev tests succeeded.', '\033[0m'
-    print '\033[96;1m', num_robarm_test_successes, 'out of', 12, 'robarm tests succeeded.', '\033[0m'
-
-    num_tests = 39
-    print '\033[96;1m', num_2d_test_successes + num_xytheta_test_successes + num_xythetamlev_test_successes + \
-          num_robarm_test_successes, 'out of', num_tests, 'tests succeeded.', '\033[0m'
-
-    print
-    print '\033[96;1m', 'Backward search results', '\033[0m'
-    print '\033[96;1m', '-----------------------', '\033[0m'
-    print '\033[96;1m', num_b_2d_test_successes, 'out of', 12, '2d tests succeeded', '\033[0m'
-    print '\033[96;1m', num_b_xytheta_test_successes, 'out of', 9, 'xytheta tests succeeded.', '\033[0m'
-    print '\033[96;1m', num_b_xythetamlev_test_successes, 'out of', 6, 'xythetamlev tests succeeded.', '\033[0m'
-
-    num_b_tests = 27
-    print '\033[96;1m', num_b_2d_test_successes + num_b_xytheta_test_successes + num_b_xythetamlev_test_successes, \
-          'out of', num_b_tests, 'tests succeeded.', '\033[0m'
+        print('Could not build SBPL and SBPL is not already pre-built. Aborting tests')
+        return 1
+    elif not args.quiet:
+        print('SBPL library and test executable built. Proceeding with tests.')
+
+    records = []
+
+    # every planner batch is an independent subprocess; one event loop keeps
+    # this many of them in flight at a time
+    max_workers = args.jobs if args.jobs else max(1, cpu_count() - 2)
+
+    # the JUnit report records one testcase per planner invocation; a batch
+    # only reports its failure count, so batching would make the XML totals
+    # disagree with the console summary
+    batch_size = 1 if args.junit_xml else args.batch_size
+
+    groups = []
+    for direction in __search_direction__:
+        if direction not in dir_set:
+            continue
+        for env in __environments__:
+            if env not in env_set:
+                continue
+            if (direction, env) not in DISPATCH:
+                print_summary(f'* skipping {env} environment, {direction} search: not supported')
+                continue
+            groups.append(((direction, env),
+                           make_jobs(env, DISPATCH[(direction, env)], direction == 'forward')))
+
+    # the group reports interleave while running, so the per-group section
+    # titles are printed up front instead of between groups; like the test
+    # reports, each section goes out as one buffered write
+    buf = StringIO()
+    for (direction, env), jobs in groups:
+        print_environment_title(f'{env} environment, {direction} search: {len(jobs)} tests scheduled', buf)
+    stdout.write(buf.getvalue())
+
+    results = run_groups(groups, max_workers, records, args.cache, batch_size,
+                         args.balance, args.server)
+
+    for direction in __search_direction__:
+        if direction not in dir_set:
+            continue
+        buf = StringIO()
+        buf.write('\n')
+        print_search_direction_title(f'{direction.capitalize()} search results', buf)
+        for env in __environments__:
+            if (direction, env) not in results:
+                continue
+            num_successes, num_tests = results[(direction, env)]
+            print_summary(f'{num_successes} out of {num_tests} {env} tests succeeded.', buf)
+
+        num_tests = sum(total for (d, _), (_, total) in results.items() if d == direction)
+        num_test_successes = sum(succeeded for (d, _), (succeeded, _) in results.items() if d == direction)
+        print_summary(f'{num_test_successes} out of {num_tests} tests succeeded.', buf)
+        stdout.write(buf.getvalue())
+    stdout.flush()
+
+    if args.junit_xml:
+        write_junit_xml(args.junit_xml, records)
+        print('JUnit report written to', args.junit_xml)
+
+    num_failures = sum(total - succeeded for (succeeded, total) in results.values())
+    return 1 if num_failures else 0
 #end main
 
-# NOTES
-# xytheta and xythetamlev environments do not support R* planning
-# envrobarm does not support backward search
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+"""
+pytest entry point for the sbpl planner tests.
+
+Runs the same declarative test matrix as sbpl_main_tests.py, one pytest case
+per planner invocation, so the suite can be scheduled by pytest and sharded
+with pytest-xdist:
+
+    pytest -n auto --dist load test/
+
+The SBPL library and test executable must already be built (run
+sbpl_main_tests.py once, or build with cmake && make); otherwise the planner
+cases are skipped.
+"""
+
+import pytest
+
+from os.path import basename, splitext
+
+from sbpl_main_tests import (_2D_CASES, _XYTHETA_CASES, _XYTHETAMLEV_CASES,
+                             _ROBARM_CASES, make_jobs, run_sbpl_test,
+                             sbpl_exe, _exists)
+
+def _all_jobs():
+    """
+    @brief expand the full forward + backward test matrix into jobs
+    """
+    jobs = []
+    jobs += make_jobs('2d', _2D_CASES, True)
+    jobs += make_jobs('xytheta', _XYTHETA_CASES, True)
+    jobs += make_jobs('xythetamlev', _XYTHETAMLEV_CASES, True)
+    jobs += make_jobs('robarm', _ROBARM_CASES, True)
+    jobs += make_jobs('2d', _2D_CASES, False)
+    jobs += make_jobs('xytheta', _XYTHETA_CASES, False)
+    jobs += make_jobs('xythetamlev', _XYTHETAMLEV_CASES, False)
+    return jobs
+#end _all_jobs
+
+def _job_id(job):
+    """
+    @brief build a readable pytest id for one job
+    """
+    env_type, planner_type, test_env, mprim, is_forward_search, navigating = job
+    parts = [env_type, planner_type, splitext(basename(test_env))[0],
+             'forward' if is_forward_search else 'backward']
+    if navigating:
+        parts.append('nav')
+    return '-'.join(parts)
+#end _job_id
+
+_JOBS = _all_jobs()
+
+def test_forward_totals_use_each_environments_own_table():
+    """
+    @brief regression test for the forward totals double-counting bug
+
+    The robarm total was once accumulated from the xythetamlev counter,
+    silently inflating the forward summary. With results keyed per
+    environment that is structurally unreachable; this pins down that the
+    two tables differ in size and that the per-environment counts add up
+    to the whole forward matrix.
+    """
+    per_env = {'2d': len(make_jobs('2d', _2D_CASES, True)),
+               'xytheta': len(make_jobs('xytheta', _XYTHETA_CASES, True)),
+               'xythetamlev': len(make_jobs('xythetamlev', _XYTHETAMLEV_CASES, True)),
+               'robarm': len(make_jobs('robarm', _ROBARM_CASES, True))}
+    assert per_env['robarm'] != per_env['xythetamlev']
+    forward_jobs = [job for job in _JOBS if job[4]]
+    assert sum(per_env.values()) == len(forward_jobs)
+#end test_forward_totals_use_each_environments_own_table
+
+@pytest.mark.skipif(not _exists(sbpl_exe), reason='test_sbpl executable is not built')
+@pytest.mark.parametrize('env_type,planner_type,test_env,mprim,is_forward_search,navigating',
+                         _JOBS, ids=[_job_id(job) for job in _JOBS])
+def test_sbpl_planner(env_type, planner_type, test_env, mprim, is_forward_search, navigating):
+    assert run_sbpl_test(env_type, planner_type, test_env, mprim,
+                         is_forward_search, navigating) == 0
+#end test_sbpl_planner